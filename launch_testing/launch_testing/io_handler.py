@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import heapq
 import threading
 
 from .asserts.assert_output import assertInStdout
@@ -26,20 +28,44 @@ class IoHandler:
     This class provides helper methods to enumerate the captured IO by individual processes
     """
 
-    def __init__(self):
-        self._sequence_list = []  # A time-ordered list of IO from all processes
-        self._process_name_dict = {}  # A dict of time ordered lists of IO key'd by the process
+    def __init__(self, max_bytes=None):
+        """
+        Create an IoHandler.
+
+        :param max_bytes: The maximum number of bytes of output to hold on to for each process.
+        When a process generates more output than this, its oldest IO is discarded.  Output from
+        other processes isn't affected.  None means no limit
+        """
+        # A dict of time ordered lists of (sequence_number, IO) key'd by the process.  The
+        # sequence numbers let us put the IO from all processes back in order
+        self._process_name_dict = {}
+        self._process_byte_counts = {}
+        self._next_sequence_number = 0
+        self._max_bytes = max_bytes
 
     def append(self, process_io):
-        self._sequence_list.append(process_io)
+        name = process_io.process_name
+
+        if name not in self._process_name_dict:
+            self._process_name_dict[name] = collections.deque()
+            self._process_byte_counts[name] = 0
 
-        if process_io.process_name not in self._process_name_dict:
-            self._process_name_dict[process_io.process_name] = []
+        process_list = self._process_name_dict[name]
+        process_list.append((self._next_sequence_number, process_io))
+        self._next_sequence_number += 1
 
-        self._process_name_dict[process_io.process_name].append(process_io)
+        if self._max_bytes is not None:
+            self._process_byte_counts[name] += len(process_io.text)
+            # Always keep the newest IO, even if it's bigger than the limit on its own
+            while self._process_byte_counts[name] > self._max_bytes and len(process_list) > 1:
+                _, oldest_io = process_list.popleft()
+                self._process_byte_counts[name] -= len(oldest_io.text)
 
     def __iter__(self):
-        return self._sequence_list.__iter__()
+        # Rebuild the time-ordered list of IO from all processes.  Sequence numbers are unique,
+        # so the IO objects themselves are never compared
+        merged = heapq.merge(*self._process_name_dict.values())
+        return (process_io for _, process_io in merged)
 
     def processes(self):
         """
@@ -47,7 +73,7 @@ class IoHandler:
 
         :returns [launch.actions.ExecuteProcess]:
         """
-        return [val[0].action for val in self._process_name_dict.values()]
+        return [val[0][1].action for val in self._process_name_dict.values()]
 
     def process_names(self):
         """
@@ -65,9 +91,10 @@ class IoHandler:
         :type key: String, or launch.actions.ExecuteProcess
         """
         if isinstance(key, str):
-            return list(self._process_name_dict[key])
+            process_list = self._process_name_dict[key]
         else:
-            return list(self._process_name_dict[key.process_details['name']])
+            process_list = self._process_name_dict[key.process_details['name']]
+        return [process_io for _, process_io in process_list]
 
 
 class ActiveIoHandler(IoHandler):
@@ -78,11 +105,11 @@ class ActiveIoHandler(IoHandler):
     additional synchronization, as well as methods to wait on incoming IO
     """
 
-    def __init__(self):
+    def __init__(self, max_bytes=None):
         self._sync_lock = threading.Condition()
         # Deliberately not calling the 'super' constructor here.  We're building this class
         # by composition so we can still give out the unsynchronized version
-        self._io_handler = IoHandler()
+        self._io_handler = IoHandler(max_bytes=max_bytes)
 
     def append(self, process_io):
         with self._sync_lock:
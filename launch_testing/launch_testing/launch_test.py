@@ -55,6 +55,10 @@ def add_arguments(parser):
         '--junit-xml', action='store', dest='xmlpath', default=None,
         help='Do write xUnit reports to specified path.'
     )
+    parser.add_argument(
+        '--launch-timeout', action='store', type=float, default=15,
+        help='Seconds to wait for the processes under test to become ready.'
+    )
 
 
 def parse_arguments():
@@ -91,7 +95,8 @@ def run(parser, args, test_runner_cls=LaunchTestRunner):
     runner = test_runner_cls(
         test_runs=test_runs,
         launch_file_arguments=args.launch_arguments,
-        debug=args.verbose
+        debug=args.verbose,
+        launch_timeout=args.launch_timeout
     )
 
     _logger_.debug('Validating test configuration')
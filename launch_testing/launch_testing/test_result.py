@@ -63,7 +63,7 @@ class TestResult(unittest.TextTestResult):
     start and stop time for the individual test cases
     """
 
-    def __init__(self, stream=None, descriptions=None, verbosity=None):
+    def __init__(self, stream=None, descriptions=True, verbosity=0):
         self.__test_cases = {}
         super().__init__(stream, descriptions, verbosity)
 
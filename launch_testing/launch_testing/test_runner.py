@@ -13,7 +13,10 @@
 # limitations under the License.
 
 import inspect
+import os
+import sys
 import threading
+import time
 import unittest
 
 import launch
@@ -33,25 +36,43 @@ class _LaunchDiedException(Exception):
     pass
 
 
+def _check_test_description_signature(test_description_function):
+    # Raises a TypeError if the function can't be called with just a ready_fn.  Don't follow
+    # __wrapped__ because parametrized descriptions are partials that look like the function
+    # they wrap
+    inspect.signature(
+        test_description_function, follow_wrapped=False
+    ).bind(ready_fn=lambda: None)
+
+
 class _RunnerWorker():
 
     def __init__(self,
                  test_run,
                  test_run_preamble,
-                 launch_file_arguments=[],
-                 debug=False):
+                 launch_arguments=[],
+                 debug=False,
+                 max_output_bytes=None,
+                 launch_timeout=15,
+                 affinity_cpu=None):
         self._test_run = test_run
         self._test_run_preamble = test_run_preamble
         self._launch_service = LaunchService(debug=debug)
         self._processes_launched = threading.Event()  # To signal when all processes started
-        self._tests_completed = threading.Event()  # To signal when all the tests have finished
-        self._launch_file_arguments = launch_file_arguments
+        self._tests_completed = False  # Set by the test thread when all the tests have finished
+        self._launch_finished = False  # Set when LaunchService.run returns
+        self._launch_arguments = launch_arguments  # Already parsed into (name, value) tuples
+        self._max_output_bytes = max_output_bytes
+        self._launch_timeout = launch_timeout  # Seconds to wait for the processes to start
+        self._affinity_cpu = affinity_cpu  # CPU to pin the pre-shutdown tests to, if any
 
         # Can't run LaunchService.run on another thread :-(
         # See https://github.com/ros2/launch/issues/126
         #
         # It would be simpler if we could run the pre-shutdown test and the post-shutdown tests on
-        # one thread, and run the launch on another thead.
+        # one thread, and run the launch on another thead.  Driving the launch from our own event
+        # loop isn't an option either - LaunchService only exposes the blocking run() call, which
+        # creates and owns its event loop.
         #
         # Instead, we'll run the pre-shutdown tests on a background thread concurrent with the
         # launch on the main thread.  Once the launch is stopped, we'll run the post-shutdown
@@ -75,60 +96,50 @@ class _RunnerWorker():
 
         # Data that needs to be bound to the tests:
         proc_info = ActiveProcInfoHandler()
-        proc_output = ActiveIoHandler()
+        proc_output = ActiveIoHandler(max_bytes=self._max_output_bytes)
         full_context = dict(test_context, **self._test_run.param_args)
-        parsed_launch_arguments = parse_launch_arguments(self._launch_file_arguments)
-        test_args = {}
-
-        for k, v in parsed_launch_arguments:
-            test_args[k] = v
-
-        self._test_run.bind(
-            self._test_run.pre_shutdown_tests,
-            injected_attributes={
-                'proc_info': proc_info,
-                'proc_output': proc_output,
+        test_args = dict(self._launch_arguments)
+
+        def bind_tests(tests, tests_proc_info, tests_proc_output):
+            # The same objects are given to the tests as attributes and as arguments.  The args
+            # are merged into one plain dict up front because bind iterates over them for every
+            # test method and fixture
+            injected = {
+                'proc_info': tests_proc_info,
+                'proc_output': tests_proc_output,
                 'test_args': test_args,
-            },
-            injected_args=dict(
-                full_context,
-                # Add a few more things to the args dictionary:
-                **{
-                    'proc_info': proc_info,
-                    'proc_output': proc_output,
-                    'test_args': test_args
-                }
+            }
+            injected_args = dict(full_context, **injected)
+            self._test_run.bind(
+                tests,
+                injected_attributes=injected,
+                injected_args=injected_args
             )
-        )
-        self._test_run.bind(
+
+        # Pre-shutdown tests get the synchronized handlers so they can wait on the processes.
+        # Post-shutdown tests get the unsynchronized versions
+        bind_tests(self._test_run.pre_shutdown_tests, proc_info, proc_output)
+        bind_tests(
             self._test_run.post_shutdown_tests,
-            injected_attributes={
-                'proc_info': proc_info._proc_info_handler,
-                'proc_output': proc_output._io_handler,
-                'test_args': test_args,
-            },
-            injected_args=dict(
-                full_context,
-                # Add a few more things to the args dictionary:
-                **{
-                    'proc_info': proc_info._proc_info_handler,
-                    'proc_output': proc_output._io_handler,
-                    'test_args': test_args
-                }
-            )
+            proc_info._proc_info_handler,
+            proc_output._io_handler
         )
 
         # Wrap the test_ld in another launch description so we can bind command line arguments to
-        # the test and add our own event handlers for process IO and process exit:
+        # the test and add our own event handlers for process IO and process exit.  The event
+        # handlers are registered with the launch context, so the include doesn't add any work
+        # when process events are dispatched, and the user's test_ld is left unmodified:
         launch_description = LaunchDescription([
             *self._test_run_preamble,
             launch.actions.IncludeLaunchDescription(
                 launch.LaunchDescriptionSource(launch_description=test_ld),
-                launch_arguments=parsed_launch_arguments
+                launch_arguments=self._launch_arguments
             ),
             RegisterEventHandler(
                 OnProcessExit(on_exit=lambda info, unused: proc_info.append(info))
             ),
+            # Always capture output, even if no test asks for proc_output.  Tests can reach it as
+            # self.proc_output, and it's needed for the summary when processes die early
             RegisterEventHandler(
                 OnProcessIO(
                     on_stdout=proc_output.append,
@@ -143,8 +154,9 @@ class _RunnerWorker():
 
         self._test_tr.start()  # Run the tests on another thread
         self._launch_service.run()  # This will block until the test thread stops it
+        self._launch_finished = True
 
-        if not self._tests_completed.wait(timeout=0):
+        if not self._tests_completed:
             # LaunchService.run returned before the tests completed.  This can be because the user
             # did ctrl+c, or because all of the launched nodes died before the tests completed
             print('Processes under test stopped before tests completed')
@@ -153,10 +165,7 @@ class _RunnerWorker():
             # We treat this as a test failure and return some test results indicating such
             raise _LaunchDiedException()
 
-        inactive_results = unittest.TextTestRunner(
-            verbosity=2,
-            resultclass=TestResult
-        ).run(self._test_run.post_shutdown_tests)
+        inactive_results = self._make_runner().run(self._test_run.post_shutdown_tests)
 
         self._results.append(inactive_results)
 
@@ -166,35 +175,96 @@ class _RunnerWorker():
         # Waits for the DUT processes to start (signaled by the _processes_launched
         # event) and then runs the tests
 
-        if not self._processes_launched.wait(timeout=15):
-            # Timed out waiting for the processes to start
-            print('Timed out waiting for processes to start up')
-            self._launch_service.shutdown()
-            return
-
+        deadline = time.monotonic() + self._launch_timeout
+        while not self._processes_launched.wait(timeout=0.25):
+            if self._launch_finished:
+                # The launch stopped before the processes were ready.  There's nothing to wait
+                # for, and nothing left to shut down
+                return
+            if time.monotonic() > deadline:
+                # Timed out waiting for the processes to start
+                print('Timed out waiting for processes to start up')
+                self._launch_service.shutdown()
+                return
+
+        original_affinity = None
         try:
-            # Run the tests
-            self._results = unittest.TextTestRunner(
-                verbosity=2,
-                resultclass=TestResult
-            ).run(self._test_run.pre_shutdown_tests)
+            original_affinity = self._pin_test_thread()
+            if self._test_run.pre_shutdown_tests.countTestCases() == 0:
+                # Only post-shutdown tests.  Skip straight to the shutdown with an empty result
+                # so it can still be combined with the post-shutdown results
+                self._results = TestResult()
+            else:
+                # Run the tests
+                self._results = self._make_runner().run(self._test_run.pre_shutdown_tests)
 
         finally:
-            self._tests_completed.set()
+            self._tests_completed = True
             self._launch_service.shutdown()
+            if original_affinity is not None:
+                os.sched_setaffinity(0, original_affinity)
+
+    def _pin_test_thread(self):
+        # Keep the tests on one CPU while they run alongside the launch.  On Linux, pid 0 refers
+        # to the calling thread, so this doesn't affect the launch on the main thread.  Returns
+        # the original affinity so it can be restored, or None if the thread wasn't pinned
+        if self._affinity_cpu is None or not hasattr(os, 'sched_setaffinity'):
+            return None
+
+        original_affinity = os.sched_getaffinity(0)
+        try:
+            os.sched_setaffinity(0, {self._affinity_cpu})
+        except OSError as e:
+            # Usually the CPU isn't one we're allowed to run on, eg because of cgroup limits.
+            # Not being pinned is no reason to fail the tests
+            print('Could not pin tests to CPU {}: {}'.format(self._affinity_cpu, e))
+            return None
+        return original_affinity
+
+    def _make_runner(self):
+        # The pre-shutdown and the post-shutdown tests are run the same way.  A new runner is
+        # made each time so it writes to whatever sys.stderr is when the tests run
+        return unittest.TextTestRunner(
+            verbosity=2,
+            resultclass=TestResult
+        )
 
     def _print_process_output_summary(self, proc_info, proc_output):
         failed_procs = [proc for proc in proc_info if proc.returncode != 0]
 
+        # Processes that fail can leave a lot of output behind.  Build up the whole summary and
+        # write it out in one go rather than printing it a piece at a time.  The output is kept as
+        # the bytes the processes produced - processes aren't guaranteed to print ASCII, or to
+        # split multi-byte characters on IO boundaries
+        summary = []
+
         for process in failed_procs:
-            print("Process '{}' exited with {}".format(process.process_name, process.returncode))
-            print("##### '{}' output #####".format(process.process_name))
+            summary.append(
+                "Process '{}' exited with {}\n".format(
+                    process.process_name, process.returncode
+                ).encode()
+            )
+            summary.append("##### '{}' output #####\n".format(process.process_name).encode())
             try:
-                for io in proc_output[process.action]:
-                    print('{}'.format(io.text.decode('ascii')))
+                summary.extend(io.text for io in proc_output[process.action])
+                summary.append(b'\n')
             except KeyError:
                 pass  # Process generated no output
-            print('#' * (len(process.process_name) + 21))
+            summary.append(b'#' * (len(process.process_name) + 21) + b'\n')
+
+        summary = b''.join(summary)
+
+        # Anything already printed to sys.stdout needs to come out before the summary
+        sys.stdout.flush()
+        try:
+            stdout_buffer = sys.stdout.buffer
+        except AttributeError:
+            # sys.stdout has been replaced by a stream that only takes text
+            sys.stdout.write(summary.decode(errors='replace'))
+            sys.stdout.flush()
+        else:
+            stdout_buffer.write(summary)
+            stdout_buffer.flush()
 
 
 class LaunchTestRunner(object):
@@ -202,7 +272,10 @@ class LaunchTestRunner(object):
     def __init__(self,
                  test_runs,
                  launch_file_arguments=[],
-                 debug=False):
+                 debug=False,
+                 max_output_bytes=None,
+                 launch_timeout=15,
+                 affinity_cpu=None):
         """
         Create an LaunchTestRunner object.
 
@@ -210,10 +283,27 @@ class LaunchTestRunner(object):
         for launching the processes under test.  This function should take a callable as a
         parameter which will be called when the processes under test are ready for the test to
         start
+
+        :param max_output_bytes: The maximum number of bytes of output to keep for each process
+        under test.  A process's oldest output is discarded beyond this limit, without affecting
+        the output of other processes.  None keeps all output.  This
+        is only available through the Python API, the launch_test command always keeps all output
+
+        :param launch_timeout: How many seconds to wait for the processes under test to signal
+        that they're ready before giving up on a test run
+
+        :param affinity_cpu: A CPU to pin the pre-shutdown tests to while they run, on platforms
+        that support it.  None leaves them unpinned.  This is only available through the Python
+        API
         """
         self._test_runs = test_runs
         self._launch_file_arguments = launch_file_arguments
+        # The launch arguments are the same for every run, so only parse them once
+        self._launch_arguments = list(parse_launch_arguments(launch_file_arguments))
         self._debug = debug
+        self._max_output_bytes = max_output_bytes
+        self._launch_timeout = launch_timeout
+        self._affinity_cpu = affinity_cpu
 
     def generate_preamble(self):
         """Generate a launch description preamble for a test to be run with."""
@@ -229,6 +319,11 @@ class LaunchTestRunner(object):
         # We will return the results as a {test_run: TestResult)}
         results = {}
 
+        # The runs are deliberately executed one after another.  LaunchService.run installs
+        # signal handlers and has to run on the main thread, the launched processes of different
+        # runs would compete for the same resources (ports, ROS domain, etc) and the results hold
+        # references to test cases and output streams that can't be sent back from a worker
+        # process.  A ctrl+c also needs to abort all of the remaining runs (see below)
         for run in self._test_runs:
             if len(self._test_runs) > 1:
                 print('\nStarting test run {}'.format(run))
@@ -236,8 +331,11 @@ class LaunchTestRunner(object):
                 worker = _RunnerWorker(
                     run,
                     self.generate_preamble(),
-                    self._launch_file_arguments,
-                    self._debug)
+                    self._launch_arguments,
+                    self._debug,
+                    self._max_output_bytes,
+                    self._launch_timeout,
+                    self._affinity_cpu)
                 results[run] = worker.run()
             except unittest.case.SkipTest as skip_exception:
                 # If a 'skip' decorator was placed on the generate_test_description function,
@@ -284,4 +382,4 @@ class LaunchTestRunner(object):
                     )
 
             # This is a double-check
-            inspect.getcallargs(run.test_description_function, ready_fn=lambda: None)
+            _check_test_description_signature(run.test_description_function)
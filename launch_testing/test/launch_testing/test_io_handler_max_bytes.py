@@ -0,0 +1,71 @@
+# Copyright 2019 Apex.AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import types
+import unittest
+
+from launch_testing import ActiveIoHandler
+from launch_testing import IoHandler
+
+
+def make_io(process_name, text):
+    return types.SimpleNamespace(
+        process_name=process_name,
+        action=process_name,
+        text=text,
+    )
+
+
+class TestIoHandlerMaxBytes(unittest.TestCase):
+
+    def test_unlimited_by_default(self):
+        dut = IoHandler()
+
+        for _ in range(100):
+            dut.append(make_io('proc', b'0123456789'))
+
+        self.assertEqual(100, len(list(dut)))
+
+    def test_oldest_output_is_discarded(self):
+        dut = IoHandler(max_bytes=8)
+
+        dut.append(make_io('proc_1', b'aaaa'))
+        dut.append(make_io('proc_2', b'bbbb'))
+        dut.append(make_io('proc_1', b'cccc'))
+        dut.append(make_io('proc_1', b'dddd'))
+
+        self.assertEqual([b'bbbb', b'cccc', b'dddd'], [io.text for io in dut])
+        self.assertEqual([b'cccc', b'dddd'], [io.text for io in dut['proc_1']])
+        self.assertEqual([b'bbbb'], [io.text for io in dut['proc_2']])
+
+    def test_noisy_process_does_not_discard_other_output(self):
+        dut = IoHandler(max_bytes=10)
+
+        dut.append(make_io('quiet_proc', b'important'))
+        for _ in range(100):
+            dut.append(make_io('noisy_proc', b'noise'))
+
+        self.assertEqual([b'important'], [io.text for io in dut['quiet_proc']])
+        self.assertEqual([b'noise', b'noise'], [io.text for io in dut['noisy_proc']])
+        self.assertEqual(
+            [b'important', b'noise', b'noise'],
+            [io.text for io in dut]
+        )
+
+    def test_newest_output_is_always_kept(self):
+        dut = ActiveIoHandler(max_bytes=2)
+
+        dut.append(make_io('proc', b'more than two bytes'))
+
+        self.assertEqual([b'more than two bytes'], [io.text for io in dut['proc']])
@@ -69,3 +69,15 @@ class TestLaunchTestRunnerValidation(unittest.TestCase):
         with self.assertRaisesRegex(Exception, 'Could not find an argument') as cm:
             dut.validate()
         self.assertIn('bad_argument', str(cm.exception))
+
+    def test_good_parametrization(self):
+
+        @launch_testing.parametrize('arg_val', [1, 2, 3])
+        def good_launch_description(arg_val, ready_fn):
+            pass  # pragma: no cover
+
+        dut = LaunchTestRunner(
+            make_test_run_for_dut(good_launch_description)
+        )
+
+        dut.validate()
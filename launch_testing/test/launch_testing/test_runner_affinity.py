@@ -0,0 +1,95 @@
+# Copyright 2019 Apex.AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+from launch_testing.loader import TestRun as TR
+from launch_testing.test_runner import _RunnerWorker
+
+import mock
+import pytest
+
+
+requires_affinity = pytest.mark.skipif(
+    not hasattr(os, 'sched_setaffinity'),
+    reason='Needs os.sched_setaffinity'
+)
+
+
+def make_worker(test_case_class, affinity_cpu):
+    worker = _RunnerWorker(
+        TR('',
+           lambda ready_fn: None,
+           {},
+           unittest.TestLoader().loadTestsFromTestCase(test_case_class),
+           unittest.TestSuite()),
+        [],
+        affinity_cpu=affinity_cpu
+    )
+    # No processes are launched.  We only exercise the test thread, and pretend the processes
+    # are already up
+    worker._launch_service = mock.Mock()
+    worker._processes_launched.set()
+    return worker
+
+
+@requires_affinity
+@pytest.mark.skipif(
+    hasattr(os, 'sched_getaffinity') and len(os.sched_getaffinity(0)) < 2,
+    reason='Pinning to the only allowed CPU would not change the affinity'
+)
+def test_affinity_cpu_is_restored_after_tests():
+    original_affinity = os.sched_getaffinity(0)
+    affinity_cpu = min(original_affinity)
+    affinity_during_test = []
+
+    class PinnedTest(unittest.TestCase):
+
+        def test_record_affinity(self):
+            affinity_during_test.append(os.sched_getaffinity(0))
+
+    worker = make_worker(PinnedTest, affinity_cpu)
+
+    # Run the pre-shutdown tests on this thread so we can check its affinity afterwards
+    worker._run_test()
+
+    assert affinity_during_test == [{affinity_cpu}]
+    assert os.sched_getaffinity(0) == original_affinity
+    assert worker._tests_completed
+    worker._launch_service.shutdown.assert_called_once_with()
+
+
+@requires_affinity
+def test_unusable_affinity_cpu_still_runs_tests(capsys):
+    original_affinity = os.sched_getaffinity(0)
+    tests_ran = []
+
+    class UnpinnedTest(unittest.TestCase):
+
+        def test_runs(self):
+            tests_ran.append(True)
+
+    worker = make_worker(UnpinnedTest, affinity_cpu=4096)  # Not a CPU we're allowed to run on
+
+    worker._run_test()
+
+    # The tests still run, unpinned, and the launch is still shut down
+    assert tests_ran == [True]
+    assert os.sched_getaffinity(0) == original_affinity
+    assert worker._tests_completed
+    worker._launch_service.shutdown.assert_called_once_with()
+
+    out, err = capsys.readouterr()
+    assert 'Could not pin tests to CPU 4096' in out
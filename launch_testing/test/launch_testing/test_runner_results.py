@@ -15,6 +15,7 @@
 import imp
 import os
 import sys
+import time
 import types
 import unittest
 
@@ -26,9 +27,12 @@ import launch.actions
 import launch_testing
 from launch_testing.loader import LoadTestsFromPythonModule
 from launch_testing.loader import TestRun as TR
+from launch_testing.test_runner import _LaunchDiedException
+from launch_testing.test_runner import _RunnerWorker
 from launch_testing.test_runner import LaunchTestRunner
 
 import mock
+import pytest
 
 
 # Run tests on processes that die early with an exit code and make sure the results returned
@@ -113,6 +117,108 @@ def test_dut_that_has_exception(capsys):
     assert 'Process had a pretend error' in out  # This is the exception text from exception_node
 
 
+def test_dut_with_non_ascii_output(capfd):
+    # Processes that die early have their output printed in the summary.  That output isn't
+    # necessarily ASCII, or even valid UTF-8.  This is a regression test for a crash decoding it.
+    # capfd is used because capsys can't read back the invalid UTF-8 that gets passed through
+
+    def generate_test_description(ready_fn):
+        return launch.LaunchDescription([
+            launch.actions.ExecuteProcess(
+                cmd=[
+                    sys.executable,
+                    '-c',
+                    # 'café', then the first two bytes of a three byte character
+                    "import sys; sys.stdout.buffer.write(b'caf\\xc3\\xa9 \\xe2\\x82\\n'); "
+                    'sys.exit(3)'
+                ]
+            ),
+
+            launch.actions.OpaqueFunction(function=lambda context: ready_fn()),
+        ])
+
+    with mock.patch('launch_testing.test_runner._RunnerWorker._run_test'):
+        runner = LaunchTestRunner(
+            [TR('', generate_test_description, {}, [], [])]
+        )
+
+        results = runner.run()
+
+        for result in results.values():
+            assert not result.wasSuccessful()
+
+    out, err = capfd.readouterr()
+    assert 'exited with 3' in out
+    assert 'café' in out
+
+
+def test_launch_timeout_when_never_ready(capsys):
+    # The processes under test never signal that they're ready.  A short launch_timeout should
+    # end the run instead of waiting for the default 15 seconds
+
+    def generate_test_description(ready_fn):
+        TEST_PROC_PATH = os.path.join(
+            ament_index_python.get_package_prefix('launch_testing'),
+            'lib/launch_testing',
+            'good_proc'
+        )
+
+        # good_proc runs until it's shut down, and ready_fn is never called
+        return launch.LaunchDescription([
+            launch.actions.ExecuteProcess(
+                cmd=[sys.executable, TEST_PROC_PATH]
+            ),
+        ])
+
+    runner = LaunchTestRunner(
+        [TR('', generate_test_description, {}, [], [])],
+        launch_timeout=1
+    )
+
+    start = time.monotonic()
+    results = runner.run()
+    assert time.monotonic() - start < 10
+
+    for result in results.values():
+        assert not result.wasSuccessful()
+
+    out, err = capsys.readouterr()
+    assert 'Timed out waiting for processes to start up' in out
+
+
+def test_test_thread_exits_when_launch_dies_before_ready(capsys):
+    # All of the processes under test exit before ready_fn is called.  The test thread should
+    # notice the launch finished instead of waiting for the whole launch_timeout
+
+    def generate_test_description(ready_fn):
+        TEST_PROC_PATH = os.path.join(
+            ament_index_python.get_package_prefix('launch_testing'),
+            'lib/launch_testing',
+            'terminating_proc'
+        )
+
+        return launch.LaunchDescription([
+            launch.actions.ExecuteProcess(
+                cmd=[sys.executable, TEST_PROC_PATH]
+            ),
+        ])
+
+    worker = _RunnerWorker(
+        TR('', generate_test_description, {}, [], []),
+        [],
+        launch_timeout=60
+    )
+
+    with pytest.raises(_LaunchDiedException):
+        worker.run()
+
+    worker._test_tr.join(timeout=5)
+    assert not worker._test_tr.is_alive()
+
+    out, err = capsys.readouterr()
+    assert 'Timed out waiting for processes to start up' not in out
+
+
 # Run some known good tests to check the nominal-good test path
 def test_nominally_good_dut():
 
@@ -257,3 +363,4 @@ def test_skipped_launch_description():
     assert skip_result.testsRun == 3
 
     # XML Structure is checked in test_xml_output.py
+